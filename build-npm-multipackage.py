@@ -3,22 +3,83 @@
 NPM 多包发布构建脚本：为每个平台创建独立的 npm 包
 采用 esbuild 风格的发布策略
 """
+import filecmp
+import hashlib
+import logging
 import os
 import shutil
 import subprocess
 import sys
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+log = logging.getLogger("build")
 
-def run_command(cmd: list[str], cwd: Path | None = None, shell: bool = False, env: dict = None) -> int:
-    """执行命令并实时输出"""
-    print(f"[执行] {' '.join(cmd) if not shell else cmd[0]}")
-    if shell:
-        result = subprocess.run(cmd[0], cwd=cwd, shell=True, env=env)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 保证并发任务的整行输出不交错
+print_lock = threading.Lock()
+
+# 所有平台包目录名（npm 的 os-cpu），各步骤的平台列表都由此派生
+PLATFORM_KEYS = ["win32-x64", "darwin-x64", "darwin-arm64", "linux-x64", "linux-arm64"]
+
+# npm -> Go 平台名映射
+NPM_TO_GOOS = {"win32": "windows", "darwin": "darwin", "linux": "linux"}
+NPM_TO_GOARCH = {"x64": "amd64", "arm64": "arm64"}
+
+
+def _write_atomic(path: Path, data: bytes):
+    """先写临时文件再替换，避免中断时留下写了一半的文件"""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _dump(obj, path: Path, indent: bool = True):
+    """写出 JSON 文件；indent=True 时为缩进的 UTF-8，否则为紧凑的 ASCII（非 ASCII 字符转义）"""
+    if not indent:
+        # orjson 不支持 ASCII 转义，紧凑输出统一走标准库，保证是否安装 orjson 结果一致
+        data = json.dumps(obj, separators=(',', ':'), ensure_ascii=True).encode('utf-8')
+    elif orjson is not None:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
     else:
-        result = subprocess.run(cmd, cwd=cwd, env=env)
-    return result.returncode
+        data = json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    _write_atomic(path, data)
+
+
+def run_command(cmd: list[str], cwd: Path | None = None, shell: bool = False, env: dict = None, tag: str | None = None) -> int:
+    """执行命令并实时输出；指定 tag 时通过管道逐行加前缀输出，便于区分并发任务"""
+    prefix = f"[{tag}] " if tag else ""
+    with print_lock:
+        log.info("%s执行 %s", prefix, ' '.join(cmd) if not shell else cmd[0])
+
+    if tag is None:
+        # 串行任务直接继承终端，保留子进程的颜色与进度输出
+        return subprocess.run(cmd[0] if shell else cmd, cwd=cwd, env=env, shell=shell).returncode
+
+    # go/vite/npm 输出均为 UTF-8，不能按本地编码（如 Windows 的 cp936）解码
+    proc = subprocess.Popen(
+        cmd[0] if shell else cmd,
+        cwd=cwd,
+        env=env,
+        shell=shell,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding='utf-8',
+        errors='replace',
+        bufsize=1,
+    )
+    for line in proc.stdout:
+        # 与工作线程打印状态信息使用同一把锁，避免日志插入到多行输出中间
+        with print_lock:
+            log.info("%s%s", prefix, line.rstrip())
+    return proc.wait()
 
 
 def clean_static_dir(static_dir: Path):
@@ -30,16 +91,102 @@ def clean_static_dir(static_dir: Path):
         print(f"[创建] {static_dir} 目录")
         return
 
-    for item in static_dir.iterdir():
-        if item.name == "README.md":
-            continue
+    items = [item for item in static_dir.iterdir() if item.name != "README.md"]
+    is_windows = sys.platform.startswith('win')
 
-        if item.is_file():
-            item.unlink()
-            print(f"[删除] {item}")
-        elif item.is_dir():
-            shutil.rmtree(item)
-            print(f"[删除] {item}/")
+    def _remove(item: Path) -> str:
+        if item.is_dir() and not item.is_symlink():
+            if is_windows:
+                # Windows 下原生 rmdir 删除大量小文件远快于 shutil.rmtree
+                subprocess.run(["cmd", "/c", "rmdir", "/s", "/q", str(item)], check=True)
+            else:
+                shutil.rmtree(item)
+            return f"{item}/"
+        item.unlink()
+        return str(item)
+
+    # 顶层条目相互独立，并发删除以重叠系统调用延迟
+    with ThreadPoolExecutor(max_workers=min(16, (os.cpu_count() or 1) * 2)) as ex:
+        for removed in ex.map(_remove, items):
+            print(f"[删除] {removed}")
+
+
+def _copy_file(src_entry: os.DirEntry, dst: str):
+    """复制单个文件，复用 scandir 缓存的 stat 信息；Linux 下用 sendfile 零拷贝"""
+    st = src_entry.stat()
+    mode = st.st_mode & 0o7777
+
+    if sys.platform.startswith('linux'):
+        src_fd = os.open(src_entry.path, os.O_RDONLY)
+        try:
+            dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+            try:
+                offset = 0
+                while offset < st.st_size:
+                    sent = os.sendfile(dst_fd, src_fd, offset, st.st_size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+                os.fchmod(dst_fd, mode)
+            finally:
+                os.close(dst_fd)
+        finally:
+            os.close(src_fd)
+    else:
+        # macOS 的 sendfile 只支持 socket，Windows 没有 sendfile
+        with open(src_entry.path, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            shutil.copyfileobj(fsrc, fdst)
+        os.chmod(dst, mode)
+
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def _fast_copy(src_entry: os.DirEntry, dst: str):
+    """递归复制文件或目录"""
+    if src_entry.is_dir():
+        os.makedirs(dst, exist_ok=True)
+        with os.scandir(src_entry.path) as it:
+            for entry in it:
+                _fast_copy(entry, os.path.join(dst, entry.name))
+    elif src_entry.is_file():
+        _copy_file(src_entry, dst)
+
+
+def _tree_files(root: Path, skip: tuple[str, ...] = ()) -> dict[str, tuple[str, int]]:
+    """列出目录下所有文件，返回 {相对路径: (绝对路径, 大小)}，skip 为需要忽略的顶层条目"""
+    files = {}
+
+    def _walk(path: str, rel: str):
+        with os.scandir(path) as it:
+            for entry in it:
+                if not rel and entry.name in skip:
+                    continue
+                rel_path = f"{rel}/{entry.name}" if rel else entry.name
+                if entry.is_dir():
+                    _walk(entry.path, rel_path)
+                elif entry.is_file():
+                    files[rel_path] = (entry.path, entry.stat().st_size)
+
+    _walk(str(root), "")
+    return files
+
+
+def static_is_up_to_date(dist_dir: Path, static_dir: Path) -> bool:
+    """static 目录内容已与 ui/dist 一致时返回 True"""
+    if not dist_dir.exists() or not static_dir.exists():
+        return False
+
+    # 先比较文件列表和大小，不一致（前端有改动时的常见情况）直接返回，无需读取内容
+    dist_files = _tree_files(dist_dir)
+    static_files = _tree_files(static_dir, skip=("README.md",))
+    if {rel: size for rel, (_, size) in dist_files.items()} != {rel: size for rel, (_, size) in static_files.items()}:
+        return False
+
+    # vite 每次构建都会重写 ui/dist，mtime 不可靠，逐个比较内容，遇到不同立即返回
+    return all(
+        filecmp.cmp(path, static_files[rel][0], shallow=False)
+        for rel, (path, _) in dist_files.items()
+    )
 
 
 def copy_dist_to_static(dist_dir: Path, static_dir: Path):
@@ -50,33 +197,86 @@ def copy_dist_to_static(dist_dir: Path, static_dir: Path):
         print(f"[错误] {dist_dir} 不存在，请先构建前端")
         return False
 
-    for item in dist_dir.iterdir():
-        dest = static_dir / item.name
+    with os.scandir(dist_dir) as it:
+        for entry in it:
+            dest = static_dir / entry.name
 
-        if item.is_file():
-            shutil.copy2(item, dest)
-            print(f"  复制文件: {item.name}")
-        elif item.is_dir():
-            if dest.exists():
-                shutil.rmtree(dest)
-            shutil.copytree(item, dest)
-            print(f"  复制目录: {item.name}/")
+            if entry.is_file():
+                _copy_file(entry, str(dest))
+                print(f"  复制文件: {entry.name}")
+            elif entry.is_dir():
+                if dest.exists():
+                    shutil.rmtree(dest)
+                _fast_copy(entry, str(dest))
+                print(f"  复制目录: {entry.name}/")
 
     return True
 
 
-def build_go_multiplatform(root_dir: Path, npm_packages_dir: Path, version_main: str = "", version_prerelease: str = "", version_build_metadata: str = "", app_channel: str = ""):
-    """构建多平台版本（每个平台一个 npm 包）"""
-    print("\n[步骤 3/5] 构建多平台 Go 程序")
+def _ldflag_x(name: str, value: str) -> str:
+    """生成 -X 版本注入参数"""
+    # 参数以列表形式传给 go，不经过 shell；go 会自行按引号切分 ldflags，仅值含空白时需要加引号
+    if any(c.isspace() for c in value):
+        return f'-X "{name}={value}"'
+    return f"-X {name}={value}"
+
+
+# 会改变 go build 产物的环境变量（GOOS/GOARCH/CGO_ENABLED 由脚本固定设置）
+GO_OUTPUT_ENV_KEYS = ("GOFLAGS", "GOAMD64", "GOARM64", "GOEXPERIMENT")
+
+
+def _source_state(root_dir: Path, env: dict) -> str | None:
+    """计算 go build 实际输入的指纹（模块内参与编译/嵌入的文件、go.mod/go.sum、Go 版本、相关环境变量），无法确定时返回 None"""
+    # 列出目标平台下模块内（非标准库）包的目录及其 Go/汇编/嵌入文件，字段以 \t 分隔
+    list_format = '{{if not .Standard}}{{.Dir}}\t{{join .GoFiles "\t"}}\t{{join .SFiles "\t"}}\t{{join .EmbedFiles "\t"}}{{end}}'
+    try:
+        listing = subprocess.run(
+            ["go", "list", "-deps", "-f", list_format, "."],
+            cwd=root_dir, env=env, capture_output=True, check=True, text=True, encoding='utf-8'
+        ).stdout
+        go_version = subprocess.run(
+            ["go", "env", "GOVERSION"],
+            cwd=root_dir, env=env, capture_output=True, check=True, text=True, encoding='utf-8'
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    root = root_dir.resolve()
+    files = {root / "go.mod", root / "go.sum"}
+    for line in listing.splitlines():
+        pkg_dir, *names = line.split("\t")
+        if not pkg_dir:
+            continue
+        pkg_dir = Path(pkg_dir).resolve()
+        # 依赖模块由 go.sum 锁定，只需计算本模块内的文件
+        if not pkg_dir.is_relative_to(root):
+            continue
+        files.update(pkg_dir / name for name in names if name)
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{go_version}\0".encode('utf-8'))
+    for key in GO_OUTPUT_ENV_KEYS:
+        h.update(f"{key}={env.get(key, '')}\0".encode('utf-8'))
+    for path in sorted(files):
+        if not path.is_file():
+            continue
+        h.update(f"{path.relative_to(root).as_posix()}\0{path.stat().st_size}\0".encode('utf-8'))
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def build_go_multiplatform(root_dir: Path, npm_packages_dir: Path, version_main: str = "", version_prerelease: str = "", version_build_metadata: str = "", app_channel: str = "", stop_event: threading.Event | None = None):
+    """构建多平台版本（每个平台一个 npm 包）；stop_event 被设置后不再开始新的平台构建"""
+    with print_lock:
+        print("\n[步骤 3/5] 构建多平台 Go 程序")
 
-    # Go -> npm 平台映射
-    platforms = [
-        ("linux", "amd64", "linux", "x64"),
-        ("linux", "arm64", "linux", "arm64"),
-        ("darwin", "amd64", "darwin", "x64"),
-        ("darwin", "arm64", "darwin", "arm64"),
-        ("windows", "amd64", "win32", "x64"),
-    ]
+    # Go -> npm 平台映射（由 PLATFORM_KEYS 派生）
+    platforms = []
+    for platform_key in PLATFORM_KEYS:
+        npm_os, npm_arch = platform_key.split("-")
+        platforms.append((NPM_TO_GOOS[npm_os], NPM_TO_GOARCH[npm_arch], npm_os, npm_arch))
 
     success_count = 0
     total_size = 0
@@ -84,19 +284,30 @@ def build_go_multiplatform(root_dir: Path, npm_packages_dir: Path, version_main:
     # 构建 ldflags，注入版本信息
     ldflags_parts = ["-s", "-w"]
     if version_main:
-        ldflags_parts.append(f"-X 'main.VERSION_MAIN={version_main}'")
+        ldflags_parts.append(_ldflag_x("main.VERSION_MAIN", version_main))
     # 总是注入，空字符串会覆盖默认的 -alpha
-    ldflags_parts.append(f"-X 'main.VERSION_PRERELEASE={version_prerelease}'")
+    ldflags_parts.append(_ldflag_x("main.VERSION_PRERELEASE", version_prerelease))
     if version_build_metadata:
-        ldflags_parts.append(f"-X 'main.VERSION_BUILD_METADATA={version_build_metadata}'")
+        ldflags_parts.append(_ldflag_x("main.VERSION_BUILD_METADATA", version_build_metadata))
     if app_channel:
-        ldflags_parts.append(f"-X 'main.APP_CHANNEL={app_channel}'")
+        ldflags_parts.append(_ldflag_x("main.APP_CHANNEL", app_channel))
 
     ldflags = " ".join(ldflags_parts)
-    print(f"版本注入信息: VERSION_MAIN={version_main}, PRERELEASE={version_prerelease}, BUILD_METADATA={version_build_metadata}, CHANNEL={app_channel}")
+    with print_lock:
+        print(f"版本注入信息: VERSION_MAIN={version_main}, PRERELEASE={version_prerelease}, BUILD_METADATA={version_build_metadata}, CHANNEL={app_channel}")
+
+    # 平分 CPU，避免多个并发构建过度抢占
+    parallel = max(1, (os.cpu_count() or 1) // len(platforms))
+
+    # 已构建二进制的缓存（npm-packages 每次都会被清空，所以单独存放）
+    bin_cache_dir = root_dir / ".gobuildcache" / "bin"
 
-    for goos, goarch, npm_os, npm_arch in platforms:
-        print(f"\n构建 {goos}/{goarch} -> {npm_os}-{npm_arch}...")
+    # 环境变量只复制一次，各构建任务共享读取，此后不得再修改 base_env
+    base_env = os.environ.copy()
+
+    def _build_one(target):
+        """构建单个平台，返回 (returncode, 文件大小)"""
+        goos, goarch, npm_os, npm_arch = target
 
         # 输出文件名
         output_name = "codekanban"
@@ -104,53 +315,105 @@ def build_go_multiplatform(root_dir: Path, npm_packages_dir: Path, version_main:
             output_name += ".exe"
 
         # 为平台创建包目录
-        platform_package_dir = npm_packages_dir / f"{npm_os}-{npm_arch}"
+        tag = f"{npm_os}-{npm_arch}"
+        platform_package_dir = npm_packages_dir / tag
         platform_package_dir.mkdir(parents=True, exist_ok=True)
         output_path = platform_package_dir / output_name
 
-        # 设置环境变量
-        env = os.environ.copy()
-        env["GOOS"] = goos
-        env["GOARCH"] = goarch
-        env["CGO_ENABLED"] = "0"
+        # 设置环境变量（每个任务基于 base_env 浅拷贝一份独立的 dict）
+        env = {
+            **base_env,
+            "GOOS": goos,
+            "GOARCH": goarch,
+            "CGO_ENABLED": "0",
+        }
 
         build_cmd = [
             "go", "build",
-            f"-ldflags={ldflags}",
+            "-ldflags", ldflags,
             "-trimpath",
+            f"-p={parallel}",
+            "-buildvcs=false",
             "-o", str(output_path),
             "."
         ]
 
-        result = subprocess.run(build_cmd, cwd=root_dir, env=env)
-
-        if result.returncode != 0:
-            print(f"[错误] {goos}/{goarch} 构建失败")
-            return result.returncode
-
-        # 输出文件大小
-        if output_path.exists():
-            size_mb = output_path.stat().st_size / (1024 * 1024)
-            total_size += output_path.stat().st_size
-            print(f"  OK: {output_name} ({size_mb:.2f} MB)")
-            success_count += 1
-
-    print(f"\n成功构建 {success_count}/{len(platforms)} 个平台")
-    print(f"总大小: {total_size / (1024 * 1024):.2f} MB")
+        # 其他步骤已失败时不再开始构建
+        if stop_event is not None and stop_event.is_set():
+            with print_lock:
+                print(f"[取消] {goos}/{goarch} 构建已取消")
+            return 1, 0
+
+        # 源码与构建参数都未变化时，直接复用上次的二进制
+        build_key = None
+        source_state = _source_state(root_dir, env)
+        if source_state:
+            build_key = hashlib.blake2b(f"{source_state}\0{ldflags}\0{goos}\0{goarch}".encode('utf-8'), digest_size=16).hexdigest()
+        cached_dir = bin_cache_dir / tag
+        cached_key_file = cached_dir / ".build-key"
+        cached_bin = cached_dir / output_name
+
+        if build_key and cached_bin.exists() and cached_key_file.exists() and cached_key_file.read_text(encoding='utf-8') == build_key:
+            shutil.copy2(cached_bin, output_path)
+            size = output_path.stat().st_size
+            with print_lock:
+                print(f"\n构建 {goos}/{goarch} -> {tag}...")
+                print(f"  OK: {output_name} ({size / (1024 * 1024):.2f} MB，源码未变化，复用缓存)")
+            return 0, size
+
+        with print_lock:
+            print(f"\n构建 {goos}/{goarch} -> {tag}...")
+
+        ret = run_command(build_cmd, cwd=root_dir, env=env, tag=tag)
+
+        with print_lock:
+            if ret != 0:
+                print(f"[错误] {goos}/{goarch} 构建失败")
+                return ret, 0
+
+            # 输出文件大小
+            if not output_path.exists():
+                return 0, None
+            size = output_path.stat().st_size
+            print(f"  OK: {output_name} ({size / (1024 * 1024):.2f} MB)")
+
+        # 更新缓存：先删除旧 key，确保 key 与二进制始终对应
+        if build_key:
+            cached_dir.mkdir(parents=True, exist_ok=True)
+            cached_key_file.unlink(missing_ok=True)
+            shutil.copy2(output_path, cached_bin)
+            cached_key_file.write_text(build_key, encoding='utf-8')
+
+        return 0, size
+
+    # 各平台构建相互独立且输出路径不同，并发执行
+    executor = ThreadPoolExecutor(max_workers=len(platforms))
+    futures = [executor.submit(_build_one, target) for target in platforms]
+    try:
+        for future in as_completed(futures):
+            ret, size = future.result()
+            if ret != 0:
+                for f in futures:
+                    f.cancel()
+                return ret
+            if size is not None:
+                total_size += size
+                success_count += 1
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    with print_lock:
+        print(f"\n成功构建 {success_count}/{len(platforms)} 个平台")
+        print(f"总大小: {total_size / (1024 * 1024):.2f} MB")
     return 0
 
 
 def create_platform_packages(root_dir: Path, npm_packages_dir: Path, version: str, base_name: str):
     """为每个平台创建 package.json 和标记文件"""
-    print("\n[步骤 4/5] 创建平台包配置")
+    with print_lock:
+        print("\n[步骤 4/5] 创建平台包配置")
 
-    platforms = [
-        ("win32", "x64"),
-        ("darwin", "x64"),
-        ("darwin", "arm64"),
-        ("linux", "x64"),
-        ("linux", "arm64"),
-    ]
+    platforms = [platform_key.split("-") for platform_key in PLATFORM_KEYS]
 
     # 根据主包名决定平台包命名规则
     # 如果主包有 scope（如 @org/name），平台包用 @org/name-platform
@@ -162,75 +425,58 @@ def create_platform_packages(root_dir: Path, npm_packages_dir: Path, version: st
         # 主包无 scope，平台包使用：@name/platform
         platform_name_template = f"@{base_name}/{{platform}}"
 
-    for npm_os, npm_arch in platforms:
-        platform_dir = npm_packages_dir / f"{npm_os}-{npm_arch}"
-
-        # 创建 .npm-global 标记文件
-        marker_file = platform_dir / ".npm-global"
-        marker_file.touch()
-        print(f"  创建标记文件: {marker_file.name}")
+    # 各平台共享的字段，只构建一次，之后只读
+    common = {
+        "version": version,
+        "homepage": "https://www.npmjs.com/package/codekanban",
+        "repository": {
+            "type": "git",
+            "url": "https://github.com/fy0/CodeKanban"
+        },
+        "author": "fy0",
+        "license": "Apache-2.0"
+    }
 
-        # 创建 package.json
+    packages = []
+    for npm_os, npm_arch in platforms:
         platform_key = f"{npm_os}-{npm_arch}"
         package_json = {
             "name": platform_name_template.format(platform=platform_key),
-            "version": version,
-            "description": f"Platform-specific binary for {npm_os}-{npm_arch}. Install 'codekanban' instead: https://www.npmjs.com/package/codekanban",
+            "description": f"Platform-specific binary for {platform_key}. Install 'codekanban' instead: https://www.npmjs.com/package/codekanban",
             "os": [npm_os],
             "cpu": [npm_arch],
-            "homepage": "https://www.npmjs.com/package/codekanban",
-            "repository": {
-                "type": "git",
-                "url": "https://github.com/fy0/CodeKanban"
-            },
-            "author": "fy0",
-            "license": "Apache-2.0"
+            **common
         }
+        packages.append((npm_packages_dir / platform_key, package_json))
 
-        package_json_path = platform_dir / "package.json"
-        with open(package_json_path, 'w', encoding='utf-8') as f:
-            json.dump(package_json, f, indent=2, ensure_ascii=False)
-
-        print(f"  创建: {package_json['name']}")
-
-    return 0
-
-
-def create_main_package(root_dir: Path, version: str, base_name: str):
-    """创建主包的 package.json 和启动脚本"""
-    print("\n[步骤 5/5] 创建主包")
+    def _write_package(item):
+        platform_dir, package_json = item
 
-    # README.md 已经是英文版，无需复制
+        # 创建 .npm-global 标记文件（空文件即可，无需 touch 额外的 utime 调用）
+        marker_file = platform_dir / ".npm-global"
+        os.close(os.open(marker_file, os.O_CREAT | os.O_WRONLY, 0o644))
 
-    # 根据主包名决定平台包命名规则（与 create_platform_packages 保持一致）
-    if base_name.startswith('@'):
-        # 主包有 scope，平台包沿用：@org/name-platform
-        platform_name_template = f"{base_name}-{{platform}}"
-    else:
-        # 主包无 scope，平台包使用：@name/platform
-        platform_name_template = f"@{base_name}/{{platform}}"
+        # 平台包 package.json 仅供 npm 读取，输出紧凑 JSON
+        _dump(package_json, platform_dir / "package.json", indent=False)
+        return marker_file, package_json
 
-    # 平台列表
-    platforms = ["win32-x64", "darwin-x64", "darwin-arm64", "linux-x64", "linux-arm64"]
+    # 各平台目录互不相同，并发写入
+    with ThreadPoolExecutor(max_workers=len(packages)) as ex:
+        for marker_file, package_json in ex.map(_write_package, packages):
+            with print_lock:
+                print(f"  创建标记文件: {marker_file.name}")
+                print(f"  创建: {package_json['name']}")
 
-    # 生成平台映射
-    platforms_mapping = "\n".join([
-        f"  '{p}': '{platform_name_template.format(platform=p)}'," for p in platforms
-    ])
+    return 0
 
-    # 创建 bin 目录
-    bin_dir = root_dir / "npm-bin"
-    bin_dir.mkdir(exist_ok=True)
 
-    # 创建启动脚本
-    launcher_script = f'''#!/usr/bin/env node
+# 主包启动脚本模板，{platforms_json} 与 {base_name} 由 create_main_package 填充
+_LAUNCHER_TEMPLATE = '''#!/usr/bin/env node
 const {{ spawn }} = require('child_process');
 const path = require('path');
 
 // 平台映射
-const PLATFORMS = {{
-{platforms_mapping}
-}};
+const PLATFORMS = {platforms_json};
 
 const platform = process.platform;
 const arch = process.arch;
@@ -280,9 +526,39 @@ child.on('exit', (code) => {{
 }});
 '''
 
+
+def create_main_package(root_dir: Path, version: str, base_name: str):
+    """创建主包的 package.json 和启动脚本"""
+    print("\n[步骤 5/5] 创建主包")
+
+    # README.md 已经是英文版，无需复制
+
+    # 根据主包名决定平台包命名规则（与 create_platform_packages 保持一致）
+    if base_name.startswith('@'):
+        # 主包有 scope，平台包沿用：@org/name-platform
+        platform_name_template = f"{base_name}-{{platform}}"
+    else:
+        # 主包无 scope，平台包使用：@name/platform
+        platform_name_template = f"@{base_name}/{{platform}}"
+
+    # 平台列表
+    platforms = PLATFORM_KEYS
+
+    # 生成平台映射（JSON 对象字面量同时也是合法的 JS，并能正确转义包名）
+    platforms_json = json.dumps({p: platform_name_template.format(platform=p) for p in platforms}, indent=2)
+
+    # 创建 bin 目录
+    bin_dir = root_dir / "npm-bin"
+    bin_dir.mkdir(exist_ok=True)
+
+    # 创建启动脚本
+    launcher_script = _LAUNCHER_TEMPLATE.format_map({
+        "platforms_json": platforms_json,
+        "base_name": base_name,
+    })
+
     launcher_path = bin_dir / "codekanban.js"
-    with open(launcher_path, 'w', encoding='utf-8', newline='\n') as f:
-        f.write(launcher_script)
+    _write_atomic(launcher_path, launcher_script.encode('utf-8'))
 
     print(f"  创建启动脚本: {launcher_path}")
 
@@ -324,8 +600,7 @@ child.on('exit', (code) => {{
     }
 
     main_package_path = root_dir / "package.json"
-    with open(main_package_path, 'w', encoding='utf-8') as f:
-        json.dump(main_package_json, f, indent=2, ensure_ascii=False)
+    _dump(main_package_json, main_package_path)
 
     print(f"  更新主包: {main_package_path}")
 
@@ -335,6 +610,8 @@ child.on('exit', (code) => {{
 def main():
     import argparse
 
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(message)s", stream=sys.stdout)
+
     parser = argparse.ArgumentParser(description='NPM 多包发布构建')
     parser.add_argument('--version', type=str, default='0.0.3', help='版本号')
     parser.add_argument('--package-name', type=str, default='codekanban', help='包名')
@@ -383,29 +660,49 @@ def main():
 
     # 步骤 2: 复制产物到 static
     print("\n[步骤 2/5] 复制前端产物到 static 目录")
-    clean_static_dir(static_dir)
-    if not copy_dist_to_static(dist_dir, static_dir):
-        return 1
+    if static_is_up_to_date(dist_dir, static_dir):
+        print("[跳过] ui/dist 未变化，static 目录已是最新")
+    else:
+        clean_static_dir(static_dir)
+        if not copy_dist_to_static(dist_dir, static_dir):
+            return 1
 
     # 步骤 3: 构建多平台 Go 程序
     version = args.version
     base_name = args.package_name
 
-    ret = build_go_multiplatform(
-        root_dir,
-        npm_packages_dir,
-        version_main=args.version_main,
-        version_prerelease=args.version_prerelease,
-        version_build_metadata=args.version_build_metadata,
-        app_channel=args.app_channel
-    )
-    if ret != 0:
-        return ret
+    # 步骤 4 只依赖平台目录，与耗时的 Go 构建并行执行
+    for platform in PLATFORM_KEYS:
+        (npm_packages_dir / platform).mkdir(exist_ok=True)
+
+    stop_event = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        build_future = executor.submit(
+            build_go_multiplatform,
+            root_dir,
+            npm_packages_dir,
+            version_main=args.version_main,
+            version_prerelease=args.version_prerelease,
+            version_build_metadata=args.version_build_metadata,
+            app_channel=args.app_channel,
+            stop_event=stop_event
+        )
+
+        # 步骤 4: 创建平台包配置；失败时通知 Go 构建不再开始新的平台（已在运行的构建会等待其结束）
+        try:
+            packages_ret = create_platform_packages(root_dir, npm_packages_dir, version, base_name)
+        except BaseException:
+            stop_event.set()
+            raise
+        if packages_ret != 0:
+            stop_event.set()
+
+        ret = build_future.result()
 
-    # 步骤 4: 创建平台包配置
-    ret = create_platform_packages(root_dir, npm_packages_dir, version, base_name)
     if ret != 0:
         return ret
+    if packages_ret != 0:
+        return packages_ret
 
     # 步骤 5: 创建主包
     ret = create_main_package(root_dir, version, base_name)
@@ -417,7 +714,7 @@ def main():
     print("=" * 60)
     print("\n接下来的步骤:")
     print("  1. 发布所有平台包:")
-    for platform in ["win32-x64", "darwin-x64", "darwin-arm64", "linux-x64", "linux-arm64"]:
+    for platform in PLATFORM_KEYS:
         print(f"     cd npm-packages/{platform} && npm publish --access public")
     print("  2. 发布主包:")
     print("     npm publish --access public")
@@ -2,16 +2,22 @@
 """
 构建脚本：先构建前端，再将产物复制到 static 目录，最后构建 Go 程序
 """
+import filecmp
+import logging
 import os
 import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
+log = logging.getLogger("build")
+
+
 def run_command(cmd: list[str], cwd: Path | None = None, shell: bool = False) -> int:
     """执行命令并实时输出"""
-    print(f"[执行] {' '.join(cmd) if not shell else cmd[0]}")
+    log.info("执行 %s", ' '.join(cmd) if not shell else cmd[0])
     if shell:
         # Windows 下需要 shell=True 来执行 pnpm
         result = subprocess.run(cmd[0], cwd=cwd, shell=True)
@@ -29,16 +35,102 @@ def clean_static_dir(static_dir: Path):
         print(f"[创建] {static_dir} 目录")
         return
 
-    for item in static_dir.iterdir():
-        if item.name == "README.md":
-            continue
+    items = [item for item in static_dir.iterdir() if item.name != "README.md"]
+    is_windows = sys.platform.startswith('win')
+
+    def _remove(item: Path) -> str:
+        if item.is_dir() and not item.is_symlink():
+            if is_windows:
+                # Windows 下原生 rmdir 删除大量小文件远快于 shutil.rmtree
+                subprocess.run(["cmd", "/c", "rmdir", "/s", "/q", str(item)], check=True)
+            else:
+                shutil.rmtree(item)
+            return f"{item}/"
+        item.unlink()
+        return str(item)
+
+    # 顶层条目相互独立，并发删除以重叠系统调用延迟
+    with ThreadPoolExecutor(max_workers=min(16, (os.cpu_count() or 1) * 2)) as ex:
+        for removed in ex.map(_remove, items):
+            print(f"[删除] {removed}")
+
+
+def _copy_file(src_entry: os.DirEntry, dst: str):
+    """复制单个文件，复用 scandir 缓存的 stat 信息；Linux 下用 sendfile 零拷贝"""
+    st = src_entry.stat()
+    mode = st.st_mode & 0o7777
+
+    if sys.platform.startswith('linux'):
+        src_fd = os.open(src_entry.path, os.O_RDONLY)
+        try:
+            dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+            try:
+                offset = 0
+                while offset < st.st_size:
+                    sent = os.sendfile(dst_fd, src_fd, offset, st.st_size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+                os.fchmod(dst_fd, mode)
+            finally:
+                os.close(dst_fd)
+        finally:
+            os.close(src_fd)
+    else:
+        # macOS 的 sendfile 只支持 socket，Windows 没有 sendfile
+        with open(src_entry.path, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            shutil.copyfileobj(fsrc, fdst)
+        os.chmod(dst, mode)
+
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def _fast_copy(src_entry: os.DirEntry, dst: str):
+    """递归复制文件或目录"""
+    if src_entry.is_dir():
+        os.makedirs(dst, exist_ok=True)
+        with os.scandir(src_entry.path) as it:
+            for entry in it:
+                _fast_copy(entry, os.path.join(dst, entry.name))
+    elif src_entry.is_file():
+        _copy_file(src_entry, dst)
+
+
+def _tree_files(root: Path, skip: tuple[str, ...] = ()) -> dict[str, tuple[str, int]]:
+    """列出目录下所有文件，返回 {相对路径: (绝对路径, 大小)}，skip 为需要忽略的顶层条目"""
+    files = {}
+
+    def _walk(path: str, rel: str):
+        with os.scandir(path) as it:
+            for entry in it:
+                if not rel and entry.name in skip:
+                    continue
+                rel_path = f"{rel}/{entry.name}" if rel else entry.name
+                if entry.is_dir():
+                    _walk(entry.path, rel_path)
+                elif entry.is_file():
+                    files[rel_path] = (entry.path, entry.stat().st_size)
+
+    _walk(str(root), "")
+    return files
+
+
+def static_is_up_to_date(dist_dir: Path, static_dir: Path) -> bool:
+    """static 目录内容已与 ui/dist 一致时返回 True"""
+    if not dist_dir.exists() or not static_dir.exists():
+        return False
+
+    # 先比较文件列表和大小，不一致（前端有改动时的常见情况）直接返回，无需读取内容
+    dist_files = _tree_files(dist_dir)
+    static_files = _tree_files(static_dir, skip=("README.md",))
+    if {rel: size for rel, (_, size) in dist_files.items()} != {rel: size for rel, (_, size) in static_files.items()}:
+        return False
 
-        if item.is_file():
-            item.unlink()
-            print(f"[删除] {item}")
-        elif item.is_dir():
-            shutil.rmtree(item)
-            print(f"[删除] {item}/")
+    # vite 每次构建都会重写 ui/dist，mtime 不可靠，逐个比较内容，遇到不同立即返回
+    return all(
+        filecmp.cmp(path, static_files[rel][0], shallow=False)
+        for rel, (path, _) in dist_files.items()
+    )
 
 
 def copy_dist_to_static(dist_dir: Path, static_dir: Path):
@@ -49,22 +141,25 @@ def copy_dist_to_static(dist_dir: Path, static_dir: Path):
         print(f"[错误] {dist_dir} 不存在，请先构建前端")
         return False
 
-    for item in dist_dir.iterdir():
-        dest = static_dir / item.name
+    with os.scandir(dist_dir) as it:
+        for entry in it:
+            dest = static_dir / entry.name
 
-        if item.is_file():
-            shutil.copy2(item, dest)
-            print(f"  复制文件: {item.name}")
-        elif item.is_dir():
-            if dest.exists():
-                shutil.rmtree(dest)
-            shutil.copytree(item, dest)
-            print(f"  复制目录: {item.name}/")
+            if entry.is_file():
+                _copy_file(entry, str(dest))
+                print(f"  复制文件: {entry.name}")
+            elif entry.is_dir():
+                if dest.exists():
+                    shutil.rmtree(dest)
+                _fast_copy(entry, str(dest))
+                print(f"  复制目录: {entry.name}/")
 
     return True
 
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(message)s", stream=sys.stdout)
+
     # 获取项目根目录
     root_dir = Path(__file__).parent.absolute()
     ui_dir = root_dir / "ui"
@@ -95,10 +190,12 @@ def main():
 
     # 步骤 2: 复制产物到 static
     print("\n[步骤 2/3] 复制前端产物到 static 目录")
-    clean_static_dir(static_dir)
-
-    if not copy_dist_to_static(dist_dir, static_dir):
-        return 1
+    if static_is_up_to_date(dist_dir, static_dir):
+        print("[跳过] ui/dist 未变化，static 目录已是最新")
+    else:
+        clean_static_dir(static_dir)
+        if not copy_dist_to_static(dist_dir, static_dir):
+            return 1
 
     # 步骤 3: 构建 Go 程序
     print("\n[步骤 3/3] 构建 Go 程序（优化模式）")
@@ -3,30 +3,79 @@
 自动发布所有 npm 包的脚本
 """
 import json
+import logging
 import os
+import shutil
 import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-
-def run_command(cmd: list[str], cwd: Path | None = None, shell: bool = False) -> int:
-    """执行命令并实时输出"""
-    print(f"\n[执行] {' '.join(cmd)}")
-    print(f"[目录] {cwd if cwd else Path.cwd()}")
-    print("-" * 60)
-
-    # Windows 需要使用 shell=True
-    is_windows = sys.platform.startswith('win')
-
-    if is_windows:
-        cmd_str = ' '.join(cmd)
-        result = subprocess.run(cmd_str, cwd=cwd, shell=True)
-    elif shell:
-        result = subprocess.run(cmd[0], cwd=cwd, shell=True)
-    else:
-        result = subprocess.run(cmd, cwd=cwd)
-
-    return result.returncode
+log = logging.getLogger("publish")
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 保证并发任务的整行输出不交错
+print_lock = threading.Lock()
+
+
+def run_command(cmd: list[str], cwd: Path | None = None, shell: bool = False, tag: str | None = None) -> int:
+    """执行命令并实时输出；指定 tag 时通过管道逐行加前缀输出，便于区分并发任务"""
+    prefix = f"[{tag}] " if tag else ""
+    with print_lock:
+        log.info("%s执行 %s", prefix, ' '.join(cmd))
+        log.info("%s目录 %s", prefix, cwd if cwd else Path.cwd())
+
+    if tag is None:
+        # 串行任务直接继承终端，保留子进程的颜色与进度输出
+        return subprocess.run(cmd[0] if shell else cmd, cwd=cwd, shell=shell).returncode
+
+    # go/vite/npm 输出均为 UTF-8，不能按本地编码（如 Windows 的 cp936）解码
+    proc = subprocess.Popen(
+        cmd[0] if shell else cmd,
+        cwd=cwd,
+        shell=shell,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding='utf-8',
+        errors='replace',
+        bufsize=1,
+    )
+    for line in proc.stdout:
+        # 与工作线程打印状态信息使用同一把锁，避免日志插入到多行输出中间
+        with print_lock:
+            log.info("%s%s", prefix, line.rstrip())
+    return proc.wait()
+
+
+def _load(path: Path):
+    """读取 JSON 文件，优先使用 orjson"""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def is_published(npm_exe: str, name: str, version: str, cwd: Path | None = None) -> bool:
+    """检查指定版本是否已发布到 registry（一次 GET，避免重复上传整个 tarball）"""
+    result = subprocess.run(
+        [npm_exe, "view", f"{name}@{version}", "version", "--json"],
+        cwd=cwd, capture_output=True, text=True, errors='replace'
+    )
+    if result.returncode != 0 or not result.stdout.strip():
+        return False
+    try:
+        published = json.loads(result.stdout)
+    except ValueError:
+        return False
+    if isinstance(published, list):
+        return version in published
+    return published == version
 
 
 def is_github_actions() -> bool:
@@ -35,6 +84,8 @@ def is_github_actions() -> bool:
 
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(message)s", stream=sys.stdout)
+
     root_dir = Path(__file__).parent.absolute()
     npm_packages_dir = root_dir / "npm-packages"
 
@@ -53,9 +104,8 @@ def main():
         print(f"\n[错误] {main_package_json} 不存在")
         return 1
 
-    with open(main_package_json, 'r', encoding='utf-8') as f:
-        main_pkg = json.load(f)
-        main_package_name = main_pkg.get('name', 'unknown')
+    main_pkg = _load(main_package_json)
+    main_package_name = main_pkg.get('name', 'unknown')
 
     # 平台包列表
     platforms = [
@@ -66,9 +116,15 @@ def main():
         "linux-arm64"
     ]
 
+    # 解析 npm 可执行文件路径，Windows 下直接调用 npm.cmd，无需经过 shell
+    npm_exe = shutil.which("npm.cmd") or shutil.which("npm")
+    if not npm_exe:
+        print("\n[错误] 未找到 npm，请先安装 Node.js")
+        return 1
+
     # 调试信息：检查 npm 认证
     print("\n[调试] 检查 npm 认证状态...")
-    check_auth_cmd = ["npm", "whoami"]
+    check_auth_cmd = [npm_exe, "whoami"]
     auth_result = run_command(check_auth_cmd, cwd=root_dir)
 
     if auth_result != 0:
@@ -92,7 +148,7 @@ def main():
         print("[调试] npm 认证成功")
 
     # 构建发布命令
-    publish_cmd = ["npm", "publish", "--access", "public"]
+    publish_cmd = [npm_exe, "publish", "--access", "public"]
 
     # Granular access tokens 在某些情况下与 --provenance 不兼容
     # 暂时禁用以测试基本发布功能
@@ -105,52 +161,74 @@ def main():
 
     # 发布所有平台包
     print("\n[步骤 1/2] 发布平台包")
-    for platform in platforms:
+
+    def _publish_platform(platform: str) -> int:
+        """发布单个平台包"""
         platform_dir = npm_packages_dir / platform
 
         if not platform_dir.exists():
-            print(f"\n[警告] {platform_dir} 不存在，跳过")
-            continue
+            with print_lock:
+                print(f"\n[警告] {platform_dir} 不存在，跳过")
+            return 0
 
         # 读取平台包名称
         platform_package_json = platform_dir / "package.json"
         if platform_package_json.exists():
-            with open(platform_package_json, 'r', encoding='utf-8') as f:
-                pkg = json.load(f)
-                pkg_name = pkg.get('name', f'unknown-{platform}')
-                pkg_version = pkg.get('version', 'unknown')
+            pkg = _load(platform_package_json)
+            pkg_name = pkg.get('name', f'unknown-{platform}')
+            pkg_version = pkg.get('version', 'unknown')
         else:
             pkg_name = f'unknown-{platform}'
             pkg_version = 'unknown'
 
-        print(f"\n[调试] 准备发布: {pkg_name}@{pkg_version}")
-        print(f"[调试] 包目录: {platform_dir}")
-        print(f"[调试] 发布命令: {' '.join(publish_cmd)}")
+        if platform_package_json.exists() and is_published(npm_exe, pkg_name, pkg_version, cwd=platform_dir):
+            with print_lock:
+                print(f"\n[跳过] {pkg_name}@{pkg_version} 已发布")
+            return 0
+
+        with print_lock:
+            print(f"\n[调试] 准备发布: {pkg_name}@{pkg_version}")
+            print(f"[调试] 包目录: {platform_dir}")
+            print(f"[调试] 发布命令: {' '.join(publish_cmd)}")
+
+        rc = run_command(publish_cmd, cwd=platform_dir, tag=platform)
+
+        with print_lock:
+            if rc != 0:
+                print(f"\n[错误] {pkg_name} 发布失败")
+            else:
+                print(f"[成功] {pkg_name} 发布成功")
+
+        return rc
+
+    # 平台包相互独立，可并发发布
+    executor = ThreadPoolExecutor(max_workers=len(platforms))
+    futures = [executor.submit(_publish_platform, platform) for platform in platforms]
+    try:
+        for future in as_completed(futures):
+            ret = future.result()
+            if ret != 0:
+                return ret
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    # 发布主包（optionalDependencies 需要在 registry 中可解析，必须等所有平台包发布完成）
+    print("\n[步骤 2/2] 发布主包")
+    main_package_version = main_pkg.get('version', 'unknown')
+    if is_published(npm_exe, main_package_name, main_package_version, cwd=root_dir):
+        print(f"\n[跳过] {main_package_name}@{main_package_version} 已发布")
+    else:
+        print(f"\n发布 {main_package_name}...")
 
         ret = run_command(
             publish_cmd,
-            cwd=platform_dir
+            cwd=root_dir
         )
 
         if ret != 0:
-            print(f"\n[错误] {pkg_name} 发布失败")
+            print("\n[错误] 主包发布失败")
             return ret
 
-        print(f"[成功] {pkg_name} 发布成功")
-
-    # 发布主包
-    print("\n[步骤 2/2] 发布主包")
-    print(f"\n发布 {main_package_name}...")
-
-    ret = run_command(
-        publish_cmd,
-        cwd=root_dir
-    )
-
-    if ret != 0:
-        print("\n[错误] 主包发布失败")
-        return ret
-
     print("\n" + "=" * 60)
     print("所有包发布成功！")
     print("=" * 60)